@@ -7,11 +7,13 @@ Setup the CFL workspace for contributors by recursively forking submodules.
 
 import sys
 import typing as t
+from argparse import ArgumentParser
 
 import inquirer  # type: ignore[import-untyped]
 from colorama import Fore, Style
 from colorama import init as colorama_init
-from utils import git, github, postgresql, pprint, vscode
+
+from utils import cache, databases, github, manifest, postgresql, pprint, status
 
 STEP = 1
 RT = t.TypeVar("RT")
@@ -146,15 +148,43 @@ def print_exit(error: bool):
     print()
 
 
-def main() -> None:
-    """Entry point."""
-    colorama_init()
+def confirm(message: str):
+    """Prompt the user to confirm an action.
+
+    Args:
+        message: The question to ask the user.
+
+    Returns:
+        A flag designating whether the user confirmed.
+    """
+    answers = inquirer.prompt([inquirer.Confirm("confirm", message=message)])
+
+    return bool(answers) and t.cast(bool, answers["confirm"])
+
+
+def load_manifest(workspace_dir: str = "/workspace"):
+    """Load the workspace's manifest or exit if it's invalid.
+
+    Args:
+        workspace_dir: The directory of the workspace.
+
+    Returns:
+        The workspace's manifest.
+    """
+    try:
+        return manifest.load_manifest(workspace_dir)
+    except (manifest.ManifestError, OSError) as error:
+        pprint.error("Failed to load the workspace's manifest.")
+        print(f"\n{error}\n")
+        sys.exit(1)
 
-    print_intro()
 
-    submodules = step("Reading Git Submodules", git.read_submodules)
+def setup() -> None:
+    """Setup the workspace."""
+    print_intro()
 
-    code_workspace = step("Loading Code Workspace", vscode.load_code_workspace)
+    workspace_manifest = step("Loading Workspace Manifest", load_manifest)
+    connections = workspace_manifest.postgresql_connections
 
     # TODO: step(for each submodule, auto-install dependencies)
 
@@ -162,9 +192,21 @@ def main() -> None:
     db_error = step(
         "Creating PostgreSQL resources",
         postgresql.create_resources,
-        code_workspace,
+        connections,
     )
 
+    if confirm(
+        "Would you like to apply the dev/test PostgreSQL performance profile?"
+        " (recommended for running tests)"
+    ):
+        db_error = (
+            step(
+                "Applying PostgreSQL dev profile",
+                postgresql.apply_dev_profile,
+            )
+            or db_error
+        )
+
     print_optional_steps_instructions()
 
     step("Login to GitHub", github.login)
@@ -172,10 +214,134 @@ def main() -> None:
     repo_error = step(
         "Fork and clone each repo from GitHub",
         github.fork_and_clone_repos,
-        submodules,
+        workspace_manifest.submodule_dict,
+    )
+
+    cache_error = step(
+        "Creating Redis resources",
+        cache.create_resources,
+        connections,
+    )
+
+    pool_error = step(
+        "Refreshing test database pools",
+        databases.refresh_test_database_pools,
+        connections,
+    )
+
+    print_exit(error=any([db_error, cache_error, repo_error, pool_error]))
+
+
+def main() -> None:
+    """Entry point."""
+    colorama_init()
+
+    parser = ArgumentParser(description="Setup the CFL workspace for contributors.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    postgresql_profile_parser = subparsers.add_parser(
+        "postgresql-profile",
+        help="Manage the dev/test performance profile of the PostgreSQL server.",
+    )
+    postgresql_profile_parser.add_argument(
+        "action",
+        choices=["apply", "report", "revert"],
+    )
+
+    subparsers.add_parser(
+        "test-database-pools",
+        help="Refresh the pool of pre-migrated test databases of each backend.",
+    )
+
+    manifest_parser = subparsers.add_parser(
+        "manifest",
+        help="Compile and cross-check the workspace's manifest.",
+    )
+    manifest_parser.add_argument(
+        "--workspace-dir",
+        default="/workspace",
+        help="The directory of the workspace.",
+    )
+
+    database_parser = subparsers.add_parser(
+        "database",
+        help="Reset or tear down the PostgreSQL databases.",
+    )
+    database_parser.add_argument("action", choices=["reset", "teardown"])
+    database_parser.add_argument(
+        "names",
+        nargs="*",
+        help="The names of the SQL connections. If not given, all are selected.",
+    )
+    database_parser.add_argument(
+        "--yes",
+        action="store_true",
+        help="Don't ask for confirmation.",
+    )
+
+    status_parser = subparsers.add_parser(
+        "status",
+        help="Check the state of the workspace without changing it.",
+    )
+    status_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the checks as JSON instead of a table.",
     )
 
-    print_exit(error=any([db_error, repo_error]))
+    args = parser.parse_args()
+
+    if args.command == "postgresql-profile":
+        error = {
+            "apply": postgresql.apply_dev_profile,
+            "report": postgresql.report_dev_profile,
+            "revert": postgresql.revert_dev_profile,
+        }[args.action]()
+
+        sys.exit(int(error))
+
+    if args.command == "test-database-pools":
+        error = databases.refresh_test_database_pools(
+            load_manifest().postgresql_connections
+        )
+
+        sys.exit(int(error))
+
+    if args.command == "manifest":
+        workspace_manifest = load_manifest(args.workspace_dir)
+        pprint.success(
+            f"Compiled {len(workspace_manifest.folders)} folders,"
+            f" {len(workspace_manifest.submodules)} submodules and"
+            f" {len(workspace_manifest.connections)} connections."
+        )
+
+        sys.exit()
+
+    if args.command == "database":
+        if not args.yes and not confirm(
+            f"All data in {', '.join(args.names) or 'all databases'} will be"
+            " lost. Continue?"
+        ):
+            sys.exit()
+
+        error = {
+            "reset": databases.reset_databases,
+            "teardown": databases.teardown_databases,
+        }[args.action](load_manifest().postgresql_connections, args.names)
+
+        sys.exit(int(error))
+
+    if args.command == "status":
+        workspace_manifest = load_manifest()
+        error = status.status(
+            workspace_manifest.submodule_dict,
+            workspace_manifest.postgresql_connections,
+            as_json=args.json,
+        )
+
+        sys.exit(int(error))
+
+    setup()
 
 
 if __name__ == "__main__":
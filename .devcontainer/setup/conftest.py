@@ -0,0 +1,94 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:20:55(+01:00).
+
+Shared pytest fixtures for the setup script's tests.
+"""
+
+import subprocess
+import typing as t
+from pathlib import Path
+
+import pytest
+
+
+def _run_git(cwd: Path, *args: str):
+    """Run a git command in a directory and return the output.
+
+    Args:
+        cwd: The directory to run the command in.
+        args: The arguments of the git command.
+
+    Returns:
+        The stripped output of the command.
+    """
+    return (
+        subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            check=True,
+            stdout=subprocess.PIPE,
+        )
+        .stdout.decode("utf-8")
+        .strip()
+    )
+
+
+@pytest.fixture
+def run_git() -> t.Callable[..., str]:
+    """Run git commands in the fixture repos."""
+    return _run_git
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch: pytest.MonkeyPatch):
+    """Set a git identity so commits can be made in fixture repos."""
+    for variable in ["AUTHOR", "COMMITTER"]:
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "test@example.com")
+
+
+@pytest.fixture
+def make_remote(tmp_path: Path) -> t.Callable[..., Path]:
+    """Create file-based remotes with a commit on their default branch."""
+
+    def _make_remote(name: str, default_branch: str = "main"):
+        path = tmp_path / "remotes" / name
+        path.mkdir(parents=True)
+        _run_git(path, "init", "--quiet", f"--initial-branch={default_branch}")
+        _run_git(path, "commit", "--quiet", "--allow-empty", "-m", name)
+        return path
+
+    return _make_remote
+
+
+@pytest.fixture
+def make_workspace(tmp_path: Path) -> t.Callable[..., Path]:
+    """Create a workspace repo whose submodules are pinned to a commit.
+
+    The submodules' gitlinks are added directly to the index so that nothing
+    is cloned.
+    """
+
+    def _make_workspace(submodules: t.Dict[str, str], sha: str):
+        path = tmp_path / "workspace"
+        path.mkdir()
+        _run_git(path, "init", "--quiet")
+        (path / ".gitmodules").write_text(
+            "".join(
+                f'[submodule "{name}"]\n\tpath = {name}\n\turl = {url}\n'
+                for name, url in submodules.items()
+            ),
+            encoding="utf-8",
+        )
+        for name in submodules:
+            _run_git(
+                path,
+                "update-index",
+                "--add",
+                "--cacheinfo",
+                f"160000,{sha},{name}",
+            )
+        return path
+
+    return _make_workspace
@@ -0,0 +1,52 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 16:48:52(+01:00).
+
+Update each submodule to the head of its remote's default branch.
+
+The heads are resolved in parallel and the submodules are updated directly in
+the workspace's index so nothing is cloned or checked out.
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+
+from utils import git
+
+
+def main() -> None:
+    """Entry point."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="The directory of the workspace's repo.",
+    )
+    args = parser.parse_args()
+
+    submodules = git.read_submodules(os.path.join(args.repo, ".gitmodules"))
+    heads = git.get_default_branch_heads(submodules)
+    gitlinks = git.read_gitlinks(args.repo)
+
+    error = False
+    updates = {}
+    for name, submodule in submodules.items():
+        head = heads[name]
+        if head is None:
+            print(f"{name}: Failed to get the default branch's head.")
+            error = True
+        elif gitlinks.get(submodule.path) == head.sha:
+            print(f"{name}: Up to date with '{head.branch}'.")
+        else:
+            print(f"{name}: Updating to '{head.branch}' ({head.sha}).")
+            updates[submodule.path] = head.sha
+
+    if updates:
+        git.update_gitlinks(updates, args.repo)
+
+    sys.exit(int(error))
+
+
+if __name__ == "__main__":
+    main()
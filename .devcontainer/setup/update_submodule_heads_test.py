@@ -0,0 +1,79 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:20:55(+01:00).
+"""
+
+import subprocess
+import sys
+import typing as t
+from pathlib import Path
+
+from utils.git import read_gitlinks
+
+SCRIPT = Path(__file__).parent / "update_submodule_heads.py"
+OLD_SHA = "0" * 39 + "1"
+
+
+def update_submodule_heads(workspace: Path):
+    """Run the script on a workspace.
+
+    Args:
+        workspace: The directory of the workspace's repo.
+
+    Returns:
+        The completed process.
+    """
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), f"--repo={workspace}"],
+        check=False,
+        stdout=subprocess.PIPE,
+    )
+
+
+def test_update_submodule_heads(
+    make_remote: t.Callable[..., Path],
+    make_workspace: t.Callable[..., Path],
+    run_git: t.Callable[..., str],
+):
+    """Each gitlink is updated to the head of its remote's default branch."""
+    main_remote = make_remote("main-remote")
+    trunk_remote = make_remote("trunk-remote", default_branch="trunk")
+    workspace = make_workspace(
+        {"main": str(main_remote), "trunk": str(trunk_remote)}, OLD_SHA
+    )
+
+    process = update_submodule_heads(workspace)
+
+    assert process.returncode == 0
+    assert read_gitlinks(str(workspace)) == {
+        "main": run_git(main_remote, "rev-parse", "HEAD"),
+        "trunk": run_git(trunk_remote, "rev-parse", "trunk"),
+    }
+
+    # Running again finds everything up to date.
+    process = update_submodule_heads(workspace)
+
+    assert process.returncode == 0
+    assert b"Up to date with 'trunk'" in process.stdout
+
+
+def test_update_submodule_heads__unreachable(
+    tmp_path: Path,
+    make_remote: t.Callable[..., Path],
+    make_workspace: t.Callable[..., Path],
+    run_git: t.Callable[..., str],
+):
+    """An unreachable remote fails the run but other gitlinks are updated."""
+    remote = make_remote("remote")
+    workspace = make_workspace(
+        {"reachable": str(remote), "unreachable": str(tmp_path / "missing")},
+        OLD_SHA,
+    )
+
+    process = update_submodule_heads(workspace)
+
+    assert process.returncode == 1
+    assert read_gitlinks(str(workspace)) == {
+        "reachable": run_git(remote, "rev-parse", "HEAD"),
+        "unreachable": OLD_SHA,
+    }
@@ -0,0 +1,170 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 11:02:37(+01:00).
+"""
+
+import os
+import subprocess
+import typing as t
+from dataclasses import dataclass
+from subprocess import CalledProcessError
+
+from redis import Redis
+
+from . import pprint
+from .postgresql import Connection, get_service_dir
+
+HOST = "cache"
+PORT = 6379
+# Redis has 16 logical DBs by default. DB 0 is left as the shared default.
+MAX_DB = 15
+# The dotenv file, relative to a service's directory, the assignment is written
+# to. The backend scripts export it before running Django and pytest.
+ENV_FILE = ".env/.env.cache"
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """The Redis logical DB and key prefix assigned to a backend service."""
+
+    name: str
+    service_dir: str
+    db: int
+
+    @property
+    def key_prefix(self):
+        """The prefix of the service's keys."""
+        return self.name
+
+
+def get_assignments(connections: t.Sequence[Connection]):
+    """Assign a logical DB to each backend service with a SQL connection.
+
+    Services are sorted by name so the assignments are stable across rebuilds.
+
+    Args:
+        connections: The PostgreSQL connections of the backend services.
+
+    Returns:
+        The assignments.
+    """
+    names = sorted({connection.name for connection in connections})
+
+    service_dirs = {
+        connection.name: get_service_dir(connection) for connection in connections
+    }
+
+    return [
+        Assignment(name=name, service_dir=service_dirs[name], db=db)
+        for db, name in enumerate(names, start=1)
+    ]
+
+
+def get_client(db: int = 0):
+    """Get a client connected to the Redis server.
+
+    Args:
+        db: The logical DB to select.
+
+    Returns:
+        A Redis client.
+    """
+    return Redis(host=HOST, port=PORT, db=db, socket_connect_timeout=5)
+
+
+def exclude_from_git(service_dir: str, path: str):
+    """Exclude a file from a service's repo without modifying its .gitignore.
+
+    Args:
+        service_dir: The directory of the service's repo.
+        path: The path of the file, relative to the service's directory.
+    """
+    exclude_path = (
+        subprocess.run(
+            ["git", "-C", service_dir, "rev-parse", "--git-path", "info/exclude"],
+            check=True,
+            stdout=subprocess.PIPE,
+        )
+        .stdout.decode("utf-8")
+        .strip()
+    )
+    exclude_path = os.path.join(service_dir, exclude_path)
+
+    pattern = f"/{path}"
+    if os.path.isfile(exclude_path):
+        with open(exclude_path, "r", encoding="utf-8") as exclude:
+            if pattern in exclude.read().splitlines():
+                return
+
+    os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+    with open(exclude_path, "a", encoding="utf-8") as exclude:
+        exclude.write(f"{pattern}\n")
+
+
+def write_assignment(assignment: Assignment):
+    """Write an assignment to the service's dotenv file.
+
+    Args:
+        assignment: The assignment to write.
+
+    Returns:
+        A flag designating whether the assignment was written.
+    """
+    env_path = os.path.join(assignment.service_dir, ENV_FILE)
+
+    try:
+        os.makedirs(os.path.dirname(env_path), exist_ok=True)
+        with open(env_path, "w", encoding="utf-8") as env_file:
+            env_file.write(
+                "# Generated by the dev container's setup script.\n"
+                f"REDIS_HOST={HOST}\n"
+                f"REDIS_PORT={PORT}\n"
+                f"REDIS_DB={assignment.db}\n"
+                f"REDIS_KEY_PREFIX={assignment.key_prefix}\n"
+            )
+
+        exclude_from_git(assignment.service_dir, ENV_FILE)
+    except (OSError, CalledProcessError):
+        pprint.error("Failed to write assignment.")
+        return False
+
+    print(f"Wrote DB {assignment.db} to {env_path}.")
+
+    return True
+
+
+def create_resources(connections: t.Sequence[Connection]):
+    """Create Redis resources.
+
+    Each backend service is assigned its own logical DB and key prefix.
+    Assignments are only written to services which have been cloned.
+
+    The server's memory and eviction policies are set in docker-compose.yml so
+    that they persist when the cache service restarts.
+
+    Args:
+        connections: The PostgreSQL connections of the backend services.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    assignments = get_assignments(connections)
+    if len(assignments) > MAX_DB:
+        pprint.error(f"More than {MAX_DB} services to assign a logical DB to.")
+        return True
+
+    error = False
+
+    for i, assignment in enumerate(assignments, start=1):
+        pprint.header(
+            f"Cache ({i}/{len(assignments)}): {assignment.name} (DB {assignment.db})"
+        )
+
+        if not os.path.exists(os.path.join(assignment.service_dir, ".git")):
+            print(f"Skipping assignment as {assignment.service_dir} is not cloned.")
+        elif not write_assignment(assignment):
+            error = True
+
+        print()
+
+    return error
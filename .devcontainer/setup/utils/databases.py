@@ -0,0 +1,540 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:28:30(+01:00).
+
+The backend services' migrated template databases, which their databases are
+reset from and their pools of pre-migrated test databases are copied from.
+"""
+
+import hashlib
+import os
+import subprocess
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import CalledProcessError
+
+from . import pprint
+from .postgresql import (
+    Connection,
+    drop_database,
+    get_database_comment,
+    get_service_dir,
+    run_psql,
+)
+
+# Migrates a database by overriding the name of a Django project's default
+# database before the project is set up.
+MIGRATE_DATABASE_SCRIPT = """
+import django
+from django.conf import settings
+from django.core.management import call_command
+
+settings.DATABASES["default"]["NAME"] = "{dbname}"
+django.setup()
+call_command("migrate", interactive=False, verbosity=0)
+"""
+
+
+def get_migrations_hash(service_dir: str):
+    """Hash the set of migrations of a backend service.
+
+    Installed packages' migrations are accounted for by the Pipfile.lock.
+
+    Args:
+        service_dir: The directory of the service.
+
+    Returns:
+        A hex digest which changes whenever the set of migrations changes.
+    """
+    paths: t.List[str] = []
+    for dir_path, dir_names, file_names in os.walk(service_dir):
+        dir_names[:] = [
+            dir_name
+            for dir_name in dir_names
+            if dir_name not in [".venv", ".git", "node_modules"]
+        ]
+        if os.path.basename(dir_path) == "migrations":
+            paths += [
+                os.path.join(dir_path, file_name)
+                for file_name in file_names
+                if file_name.endswith(".py")
+            ]
+
+    pipfile_lock = os.path.join(service_dir, "Pipfile.lock")
+    if os.path.isfile(pipfile_lock):
+        paths.append(pipfile_lock)
+
+    migrations_hash = hashlib.sha256()
+    for path in sorted(paths):
+        migrations_hash.update(os.path.relpath(path, service_dir).encode())
+        with open(path, "rb") as file:
+            migrations_hash.update(file.read())
+
+    return migrations_hash.hexdigest()
+
+
+def get_test_database_pool_size():
+    """Get the number of test databases to keep in each backend's pool.
+
+    This matches the number of workers pytest-xdist starts with "-n=auto".
+
+    Returns:
+        The number of CPUs available to this container.
+    """
+    return len(os.sched_getaffinity(0))
+
+
+def get_test_database_name(dbname: str, index: int):
+    """Get the name of a test database as named by pytest-django.
+
+    Args:
+        dbname: The name of the database.
+        index: The index of the pytest-xdist worker.
+
+    Returns:
+        The name of the test database.
+    """
+    return f"test_{dbname}_gw{index}"
+
+
+def get_template_database_name(dbname: str):
+    """Get the name of the migrated template a test database pool is built from.
+
+    Args:
+        dbname: The name of the database.
+
+    Returns:
+        The name of the template database.
+    """
+    return f"test_{dbname}_template"
+
+
+def migrate_database(service_dir: str, dbname: str):
+    """Migrate a database with a Django project's migrations.
+
+    Args:
+        service_dir: The directory of the Django project.
+        dbname: The name of the database to migrate.
+
+    Returns:
+        A flag designating whether the database was migrated.
+    """
+    pprint.notice(f"Migrating {dbname}...")
+
+    try:
+        subprocess.run(
+            [
+                "pipenv",
+                "run",
+                "python",
+                "-c",
+                MIGRATE_DATABASE_SCRIPT.format(dbname=dbname),
+            ],
+            check=True,
+            cwd=service_dir,
+            env={
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": "settings",
+                "PIPENV_VERBOSITY": "-1",
+            },
+        )
+
+        return True
+    except CalledProcessError:
+        pprint.error("Failed to migrate database.")
+        return False
+
+
+def create_template_database(
+    connection: Connection,
+    service_dir: str,
+    migrations_hash: str,
+):
+    """Create and migrate the template database of a test database pool.
+
+    The hash of the migrations is stored as the database's comment. The test
+    databases copied from the previous template are dropped as they're stale,
+    so the pool is rebuilt the next time it's refreshed.
+
+    Args:
+        connection: The connection of the service.
+        service_dir: The directory of the service.
+        migrations_hash: The hash of the service's migrations.
+
+    Returns:
+        A flag designating whether the template database was created.
+    """
+    template = get_template_database_name(connection.database)
+
+    pprint.notice(f"Creating template {template}...")
+
+    try:
+        drop_test_database_pool(connection.database)
+        drop_database(template)
+        run_psql(
+            f"CREATE DATABASE {template} OWNER {connection.username};",
+        )
+    except CalledProcessError:
+        pprint.error("Failed to create template database.")
+        return False
+
+    if not migrate_database(service_dir, template):
+        return False
+
+    try:
+        run_psql(
+            f"COMMENT ON DATABASE {template} IS '{migrations_hash}';",
+            f"ALTER DATABASE {template} IS_TEMPLATE true;",
+        )
+    except CalledProcessError:
+        pprint.error("Failed to mark template database.")
+        return False
+
+    return True
+
+
+def service_is_set_up(service_dir: str):
+    """Check if a backend service's virtual environment is installed.
+
+    Args:
+        service_dir: The directory of the service.
+
+    Returns:
+        A flag designating whether the service is set up.
+    """
+    return os.path.isdir(os.path.join(service_dir, ".venv", "lib"))
+
+
+def service_has_root_settings(service_dir: str):
+    """Check if a backend service's settings module is at its root.
+
+    Only services with a root settings module can be migrated with
+    MIGRATE_DATABASE_SCRIPT. The legacy services keep theirs in a package.
+
+    Args:
+        service_dir: The directory of the service.
+
+    Returns:
+        A flag designating whether the service has a root settings module.
+    """
+    return os.path.isfile(os.path.join(service_dir, "settings.py"))
+
+
+def drop_test_database_pool(dbname: str):
+    """Drop all the test databases in a pool.
+
+    Args:
+        dbname: The name of the database the pool is for.
+    """
+    # Escape the underscores as they're wildcards.
+    pattern = get_test_database_name(dbname, index=0)[:-1].replace("_", "\\_")
+
+    for test_dbname in run_psql(
+        f"SELECT datname FROM pg_database WHERE datname LIKE '{pattern}%';"
+    ).splitlines():
+        drop_database(test_dbname)
+
+
+def create_test_database_pool(connection: Connection, size: int):
+    """Create a pool of test databases by copying the migrated template.
+
+    Any test databases beyond the pool's size are dropped.
+
+    Args:
+        connection: The connection of the service.
+        size: The number of test databases in the pool.
+
+    Returns:
+        A flag designating whether the pool was created.
+    """
+    dbname = connection.database
+    template = get_template_database_name(dbname)
+
+    pprint.notice(f"Creating {size} test databases from {template}...")
+
+    try:
+        drop_test_database_pool(dbname)
+
+        # Copies from the same template can't be made concurrently.
+        for index in range(size):
+            run_psql(
+                f"CREATE DATABASE {get_test_database_name(dbname, index)}"
+                f" TEMPLATE {template} OWNER {connection.username};"
+            )
+
+        return True
+    except CalledProcessError:
+        pprint.error("Failed to create test databases.")
+        return False
+
+
+def test_database_pool_is_fresh(
+    connection: Connection,
+    size: int,
+    migrations_hash: str,
+):
+    """Check if a test database pool was built from the current migrations.
+
+    Args:
+        connection: The connection of the service.
+        size: The number of test databases in the pool.
+        migrations_hash: The hash of the service's migrations.
+
+    Returns:
+        A flag designating whether the pool is fresh.
+    """
+    dbname = connection.database
+    template = get_template_database_name(dbname)
+    names = ", ".join(
+        f"'{get_test_database_name(dbname, index)}'" for index in range(size)
+    )
+
+    template_hash, pool_size = run_psql(
+        "SELECT ("
+        "SELECT shobj_description(oid, 'pg_database') FROM pg_database"
+        f" WHERE datname='{template}'"
+        "), ("
+        f"SELECT count(*) FROM pg_database WHERE datname IN ({names})"
+        ");"
+    ).split("|")
+
+    return template_hash == migrations_hash and int(pool_size) == size
+
+
+def refresh_test_database_pools(connections: t.Sequence[Connection]):
+    """Refresh the pool of pre-migrated test databases of each backend service.
+
+    Pools are only rebuilt if the service's migrations have changed. The test
+    databases are named as pytest-django names them when running in parallel
+    so that they are reused by "--reuse-db".
+
+    Args:
+        connections: The PostgreSQL connections of the backend services.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    error = False
+
+    size = get_test_database_pool_size()
+
+    for i, connection in enumerate(connections, start=1):
+        pprint.header(f"Database ({i}/{len(connections)}): {connection.name}")
+
+        service_dir = get_service_dir(connection)
+        if not service_is_set_up(service_dir):
+            print(f"Skipping as {service_dir} is not set up.\n")
+            continue
+        if not service_has_root_settings(service_dir):
+            print(f"Skipping as {service_dir} has no root settings module.\n")
+            continue
+
+        migrations_hash = get_migrations_hash(service_dir)
+
+        try:
+            fresh = test_database_pool_is_fresh(connection, size, migrations_hash)
+        except CalledProcessError:
+            pprint.error("Failed to check test databases.")
+            error = True
+            print()
+            continue
+
+        if fresh:
+            print("Test databases are up to date.\n")
+            continue
+
+        created_pool = create_template_database(
+            connection, service_dir, migrations_hash
+        ) and create_test_database_pool(connection, size)
+
+        if not created_pool:
+            error = True
+
+        print()
+
+    return error
+
+
+def ensure_template_database(connection: Connection):
+    """Make sure a connection's migrated template database is up to date.
+
+    If the service isn't set up or has no root settings module, the template
+    can't be migrated so an existing template is kept as is.
+
+    Args:
+        connection: The connection of the service.
+
+    Returns:
+        A flag designating whether the template database is available.
+    """
+    template = get_template_database_name(connection.database)
+    service_dir = get_service_dir(connection)
+
+    try:
+        template_hash = get_database_comment(template)
+    except CalledProcessError:
+        pprint.error("Failed to check template database.")
+        return False
+
+    if not service_is_set_up(service_dir) or not service_has_root_settings(service_dir):
+        if template_hash:
+            return True
+
+        pprint.error(f"No template as {service_dir} can't be migrated.")
+        return False
+
+    migrations_hash = get_migrations_hash(service_dir)
+    if template_hash == migrations_hash:
+        return True
+
+    return create_template_database(connection, service_dir, migrations_hash)
+
+
+def reset_database(connection: Connection):
+    """Reset a database by copying its migrated template database.
+
+    Open sessions to the database are terminated.
+
+    Args:
+        connection: The connection of the database.
+
+    Returns:
+        A flag designating whether the database was reset.
+    """
+    if not ensure_template_database(connection):
+        return False
+
+    dbname = connection.database
+    template = get_template_database_name(dbname)
+
+    try:
+        drop_database(dbname)
+        run_psql(
+            f"CREATE DATABASE {dbname}"
+            f" TEMPLATE {template} OWNER {connection.username};",
+            f"GRANT ALL PRIVILEGES ON DATABASE {dbname} TO {connection.username};",
+        )
+    except CalledProcessError:
+        pprint.error(f"Failed to reset {dbname}.")
+        return False
+
+    return True
+
+
+def teardown_database(connection: Connection):
+    """Drop a database along with its template and test databases.
+
+    Open sessions to the databases are terminated. The user is kept as it may
+    be shared with other databases.
+
+    Args:
+        connection: The connection of the database.
+
+    Returns:
+        A flag designating whether the databases were dropped.
+    """
+    dbname = connection.database
+
+    try:
+        drop_database(dbname)
+        drop_database(get_template_database_name(dbname))
+        drop_test_database_pool(dbname)
+    except CalledProcessError:
+        pprint.error(f"Failed to teardown {dbname}.")
+        return False
+
+    return True
+
+
+def select_connections(
+    connections: t.Sequence[Connection],
+    names: t.Optional[t.List[str]] = None,
+):
+    """Select the PostgreSQL connections by name.
+
+    Args:
+        connections: The PostgreSQL connections to select from.
+        names: The names of the connections. If not given, all are selected.
+
+    Returns:
+        The selected connections or None if any name is unknown.
+    """
+    if not names:
+        return list(connections)
+
+    unknown_names = set(names) - {connection.name for connection in connections}
+    if unknown_names:
+        pprint.error(f"Unknown connections: {', '.join(sorted(unknown_names))}.")
+        return None
+
+    return [connection for connection in connections if connection.name in names]
+
+
+def run_for_connections(
+    func: t.Callable[[Connection], bool],
+    connections: t.Sequence[Connection],
+):
+    """Run a database operation for each connection in parallel.
+
+    Args:
+        func: The operation, which returns whether it succeeded.
+        connections: The connections to run the operation for.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    with ThreadPoolExecutor(max_workers=len(connections) or 1) as executor:
+        results = list(executor.map(func, connections))
+
+    print()
+    for connection, succeeded in zip(connections, results):
+        if succeeded:
+            pprint.success(f"✔ {connection.database}")
+        else:
+            pprint.error(f"✘ {connection.database}")
+
+    return not all(results)
+
+
+def reset_databases(
+    connections: t.Sequence[Connection],
+    names: t.Optional[t.List[str]] = None,
+):
+    """Reset databases to a clean, migrated state in parallel.
+
+    Args:
+        connections: The PostgreSQL connections to select from.
+        names: The names of the connections. If not given, all are reset.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    selected_connections = select_connections(connections, names)
+    if selected_connections is None:
+        return True
+
+    pprint.notice(f"Resetting {len(selected_connections)} databases...")
+
+    return run_for_connections(reset_database, selected_connections)
+
+
+def teardown_databases(
+    connections: t.Sequence[Connection],
+    names: t.Optional[t.List[str]] = None,
+):
+    """Drop databases along with their templates and test databases in parallel.
+
+    Args:
+        connections: The PostgreSQL connections to select from.
+        names: The names of the connections. If not given, all are dropped.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    selected_connections = select_connections(connections, names)
+    if selected_connections is None:
+        return True
+
+    pprint.notice(f"Tearing down {len(selected_connections)} databases...")
+
+    return run_for_connections(teardown_database, selected_connections)
@@ -4,8 +4,11 @@ Created on 14/04/2025 at 16:31:07(+01:00).
 """
 
 import re
+import subprocess
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from subprocess import CalledProcessError, TimeoutExpired
 
 
 @dataclass(frozen=True)
@@ -19,14 +22,25 @@ class Submodule:
 SubmoduleDict = t.Dict[str, Submodule]
 
 
-def read_submodules() -> SubmoduleDict:
+@dataclass(frozen=True)
+class Head:
+    """The head of a remote's default branch."""
+
+    branch: str
+    sha: str
+
+
+def read_submodules(path: str = "/workspace/.gitmodules") -> SubmoduleDict:
     """Read the submodules from .gitmodules (located at the workspace's root).
 
+    Args:
+        path: The path of the .gitmodules file.
+
     Returns:
         A dict where the key is the name of the submodule and value is an object
         of the submodule's attributes.
     """
-    with open("/workspace/.gitmodules", "r", encoding="utf-8") as gitmodules:
+    with open(path, "r", encoding="utf-8") as gitmodules:
         gitmodules_str = gitmodules.read()
 
     # [1:] to skip initial blank string.
@@ -49,3 +63,106 @@ def read_submodules() -> SubmoduleDict:
         )
         for name, submodule_str in submodule_strs.items()
     }
+
+
+def get_default_branch_head(url: str, timeout: int = 30):
+    """Get the head of a remote's default branch without fetching any objects.
+
+    https://git-scm.com/docs/git-ls-remote#Documentation/git-ls-remote.txt---symref
+
+    Args:
+        url: The URL of the remote.
+        timeout: The max number of seconds to wait for the remote.
+
+    Returns:
+        The head of the default branch or None if it couldn't be resolved.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "ls-remote", "--symref", url, "HEAD"],
+            check=True,
+            stdout=subprocess.PIPE,
+            timeout=timeout,
+        ).stdout.decode("utf-8")
+    except (CalledProcessError, TimeoutExpired):
+        return None
+
+    # Expected output:
+    # ref: refs/heads/main\tHEAD
+    # <sha>\tHEAD
+    branch, sha = None, None
+    for line in output.splitlines():
+        ref = line.split("\t", maxsplit=1)[0]
+        if ref.startswith("ref: refs/heads/"):
+            branch = ref.removeprefix("ref: refs/heads/")
+        else:
+            sha = ref
+
+    return Head(branch=branch, sha=sha) if branch and sha else None
+
+
+def get_default_branch_heads(submodules: SubmoduleDict):
+    """Get the head of each submodule's default branch in parallel.
+
+    Args:
+        submodules: The submodules to get the heads of.
+
+    Returns:
+        A dict where the key is the name of the submodule and the value is the
+        head of its default branch or None if it couldn't be resolved.
+    """
+    with ThreadPoolExecutor(max_workers=len(submodules) or 1) as executor:
+        heads = executor.map(
+            get_default_branch_head,
+            [submodule.url for submodule in submodules.values()],
+        )
+
+        return dict(zip(submodules.keys(), heads))
+
+
+def read_gitlinks(repo_dir: str = "/workspace"):
+    """Read the commits the submodules are pinned to in a repo's index.
+
+    Args:
+        repo_dir: The directory of the repo.
+
+    Returns:
+        A dict where the key is the path of the submodule and the value is the
+        SHA of the commit.
+    """
+    output = subprocess.run(
+        ["git", "-C", repo_dir, "ls-files", "--stage"],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout.decode("utf-8")
+
+    # Expected line: <mode> <sha> <stage>\t<path>
+    gitlinks: t.Dict[str, str] = {}
+    for line in output.splitlines():
+        info, path = line.split("\t", maxsplit=1)
+        mode, sha, _ = info.split(" ")
+        if mode == "160000":
+            gitlinks[path] = sha
+
+    return gitlinks
+
+
+def update_gitlinks(gitlinks: t.Dict[str, str], repo_dir: str = "/workspace"):
+    """Pin submodules to commits directly in a repo's index.
+
+    The submodules don't need to be checked out.
+
+    https://git-scm.com/docs/git-update-index#_using_index_info
+
+    Args:
+        gitlinks: A dict where the key is the path of the submodule and the
+            value is the SHA of the commit to pin it to.
+        repo_dir: The directory of the repo.
+    """
+    subprocess.run(
+        ["git", "-C", repo_dir, "update-index", "--index-info"],
+        check=True,
+        input="".join(
+            f"160000 {sha}\t{path}\n" for path, sha in gitlinks.items()
+        ).encode("utf-8"),
+    )
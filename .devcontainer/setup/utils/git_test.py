@@ -0,0 +1,78 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:20:55(+01:00).
+"""
+
+import typing as t
+from pathlib import Path
+
+from .git import (
+    Head,
+    Submodule,
+    get_default_branch_head,
+    get_default_branch_heads,
+    read_gitlinks,
+    read_submodules,
+    update_gitlinks,
+)
+
+OLD_SHA = "0" * 39 + "1"
+
+
+def test_read_submodules(make_workspace: t.Callable[..., Path]):
+    """The submodules are read from the given .gitmodules file."""
+    workspace = make_workspace({"a": "https://example.com/a.git"}, OLD_SHA)
+
+    assert read_submodules(str(workspace / ".gitmodules")) == {
+        "a": Submodule(path="a", url="https://example.com/a.git")
+    }
+
+
+def test_get_default_branch_head(
+    make_remote: t.Callable[..., Path],
+    run_git: t.Callable[..., str],
+):
+    """The head of a non-main default branch is resolved."""
+    remote = make_remote("a", default_branch="trunk")
+
+    assert get_default_branch_head(str(remote)) == Head(
+        branch="trunk", sha=run_git(remote, "rev-parse", "HEAD")
+    )
+
+
+def test_get_default_branch_head__unreachable(tmp_path: Path):
+    """An unreachable remote has no head."""
+    assert get_default_branch_head(str(tmp_path / "missing")) is None
+
+
+def test_get_default_branch_heads(
+    tmp_path: Path,
+    make_remote: t.Callable[..., Path],
+    run_git: t.Callable[..., str],
+):
+    """Each submodule's head is resolved, even if another's remote fails."""
+    remote = make_remote("a")
+
+    heads = get_default_branch_heads(
+        {
+            "a": Submodule(path="a", url=str(remote)),
+            "b": Submodule(path="b", url=str(tmp_path / "missing")),
+        }
+    )
+
+    assert heads == {
+        "a": Head(branch="main", sha=run_git(remote, "rev-parse", "HEAD")),
+        "b": None,
+    }
+
+
+def test_read_and_update_gitlinks(make_workspace: t.Callable[..., Path]):
+    """Gitlinks are updated in the index without touching other gitlinks."""
+    workspace = make_workspace({"a": "a", "b": "b"}, OLD_SHA)
+    new_sha = "0" * 39 + "2"
+
+    assert read_gitlinks(str(workspace)) == {"a": OLD_SHA, "b": OLD_SHA}
+
+    update_gitlinks({"a": new_sha}, str(workspace))
+
+    assert read_gitlinks(str(workspace)) == {"a": new_sha, "b": OLD_SHA}
@@ -0,0 +1,352 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:15:42(+01:00).
+
+A precompiled manifest of the workspace, which merges the code workspace's
+folders, the submodules and the SQL connections into one validated model.
+"""
+
+import hashlib
+import json
+import os
+import typing as t
+from dataclasses import asdict, dataclass, fields
+
+import pyjson5
+
+from .git import Submodule, SubmoduleDict, read_submodules
+from .postgresql import Connection, get_service_path
+from .vscode import load_code_workspace
+
+# Bump whenever the model changes so that cached manifests are recompiled.
+VERSION = 1
+CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ".cache",
+    "manifest.json",
+)
+
+
+class ManifestError(ValueError):
+    """The workspace's source files are invalid or have drifted apart."""
+
+    def __init__(self, problems: t.List[str]):
+        super().__init__("\n".join(problems))
+        self.problems = problems
+
+
+@dataclass(frozen=True)
+class Folder:
+    """A code workspace folder."""
+
+    path: str
+    name: t.Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """The compiled manifest of the workspace."""
+
+    # The hash of the source files the manifest was compiled from.
+    key: str
+    folders: t.Tuple[Folder, ...]
+    # Pairs of a submodule's name and the submodule, in the order declared.
+    submodules: t.Tuple[t.Tuple[str, Submodule], ...]
+    connections: t.Tuple[Connection, ...]
+
+    @property
+    def submodule_dict(self) -> SubmoduleDict:
+        """The submodules where the key is the name of the submodule."""
+        return dict(self.submodules)
+
+    @property
+    def postgresql_connections(self):
+        """The SQL connections to PostgreSQL databases."""
+        return [
+            connection
+            for connection in self.connections
+            if connection.driver == "PostgreSQL"
+        ]
+
+
+def get_source_paths(workspace_dir: str):
+    """Get the paths of the source files the manifest is compiled from.
+
+    Args:
+        workspace_dir: The directory of the workspace.
+
+    Returns:
+        The paths of the code workspace and .gitmodules files.
+    """
+    return (
+        os.path.join(workspace_dir, "codeforlife.code-workspace"),
+        os.path.join(workspace_dir, ".gitmodules"),
+    )
+
+
+def get_key(workspace_dir: str):
+    """Hash the source files the manifest is compiled from.
+
+    Args:
+        workspace_dir: The directory of the workspace.
+
+    Returns:
+        A hex digest which changes whenever a source file changes.
+    """
+    key = hashlib.sha256(str(VERSION).encode())
+    for path in get_source_paths(workspace_dir):
+        with open(path, "rb") as source:
+            key.update(source.read())
+
+    return key.hexdigest()
+
+
+def validate_field_types(instance: t.Any):
+    """Validate a dataclass instance's values are of its fields' types.
+
+    Args:
+        instance: The dataclass instance to validate.
+
+    Raises:
+        TypeError: If a value isn't of its field's type.
+    """
+    for field in fields(instance):
+        value = getattr(instance, field.name)
+        types = (
+            t.get_args(field.type)
+            if t.get_origin(field.type) is t.Union
+            else (field.type,)
+        )
+        # Booleans are integers in Python but not in JSON.
+        if not isinstance(value, types) or (
+            isinstance(value, bool) and bool not in types
+        ):
+            raise TypeError(
+                f"'{field.name}' must be of type"
+                f" {' or '.join(_type.__name__ for _type in types)},"
+                f" not {type(value).__name__}."
+            )
+
+
+def validate_folders(folders: t.Any, problems: t.List[str]):
+    """Validate the code workspace's folders.
+
+    Args:
+        folders: The folders to validate.
+        problems: The problems found so far, appended to in place.
+
+    Returns:
+        The valid folders.
+    """
+    if not isinstance(folders, list):
+        problems.append("folders: Expected a list.")
+        return []
+
+    valid_folders: t.List[Folder] = []
+    for i, folder in enumerate(folders):
+        try:
+            assert isinstance(folder, dict), "Expected an object."
+            valid_folder = Folder(**folder)
+            validate_field_types(valid_folder)
+            valid_folders.append(valid_folder)
+        except (AssertionError, TypeError) as error:
+            problems.append(f"folders[{i}]: {error}")
+
+    return valid_folders
+
+
+def validate_connections(connections: t.Any, problems: t.List[str]):
+    """Validate the code workspace's SQL connections.
+
+    Args:
+        connections: The SQL connections to validate.
+        problems: The problems found so far, appended to in place.
+
+    Returns:
+        The valid SQL connections.
+    """
+    if connections is None:
+        return []
+    if not isinstance(connections, list):
+        problems.append("sqltools.connections: Expected a list.")
+        return []
+
+    valid_connections: t.List[Connection] = []
+    for i, connection in enumerate(connections):
+        try:
+            assert isinstance(connection, dict), "Expected an object."
+            valid_connection = Connection(**connection)
+            validate_field_types(valid_connection)
+            valid_connections.append(valid_connection)
+        except (AssertionError, TypeError) as error:
+            problems.append(f"sqltools.connections[{i}]: {error}")
+
+    return valid_connections
+
+
+def find_duplicates(values: t.Iterable[str]):
+    """Find the values which occur more than once.
+
+    Args:
+        values: The values to search.
+
+    Returns:
+        The duplicate values, sorted.
+    """
+    seen: t.Set[str] = set()
+    duplicates: t.Set[str] = set()
+    for value in values:
+        (duplicates if value in seen else seen).add(value)
+
+    return sorted(duplicates)
+
+
+def cross_check(manifest: Manifest, problems: t.List[str]):
+    """Check the folders, submodules and SQL connections agree.
+
+    Args:
+        manifest: The manifest to check.
+        problems: The problems found so far, appended to in place.
+    """
+    folder_paths = [folder.path for folder in manifest.folders]
+    submodule_paths = [submodule.path for _, submodule in manifest.submodules]
+
+    for label, values in [
+        ("folder path", folder_paths),
+        ("submodule path", submodule_paths),
+        ("connection name", [c.name for c in manifest.connections]),
+    ]:
+        for value in find_duplicates(values):
+            problems.append(f"Duplicate {label}: {value}")
+
+    for path in folder_paths:
+        # The root and parent folders of submodules are allowed.
+        if path != "." and not any(
+            submodule_path == path or submodule_path.startswith(f"{path}/")
+            for submodule_path in submodule_paths
+        ):
+            problems.append(f"Folder without a submodule: {path}")
+
+    for name, submodule in manifest.submodules:
+        if submodule.path not in folder_paths:
+            problems.append(f"Submodule without a folder: {name}")
+
+    for connection in manifest.postgresql_connections:
+        if get_service_path(connection) not in submodule_paths:
+            problems.append(
+                f"Connection without a backend: {connection.name}"
+                f" (expected submodule at {get_service_path(connection)})"
+            )
+
+
+def compile_manifest(workspace_dir: str = "/workspace"):
+    """Parse, validate and cross-check the workspace's source files.
+
+    Args:
+        workspace_dir: The directory of the workspace.
+
+    Returns:
+        The compiled manifest.
+
+    Raises:
+        ManifestError: If any problems were found.
+    """
+    code_workspace_path, gitmodules_path = get_source_paths(workspace_dir)
+
+    problems: t.List[str] = []
+
+    try:
+        code_workspace = load_code_workspace(code_workspace_path)
+        folders = validate_folders(code_workspace.get("folders"), problems)
+        connections = validate_connections(
+            code_workspace.get("settings", {}).get("sqltools.connections"),
+            problems,
+        )
+    except (OSError, pyjson5.Json5Exception, AttributeError) as error:
+        raise ManifestError([f"{code_workspace_path}: {error}"]) from error
+
+    try:
+        submodules = read_submodules(gitmodules_path)
+    except (OSError, ValueError, TypeError) as error:
+        raise ManifestError([f"{gitmodules_path}: {error}"]) from error
+
+    manifest = Manifest(
+        key=get_key(workspace_dir),
+        folders=tuple(folders),
+        submodules=tuple(submodules.items()),
+        connections=tuple(connections),
+    )
+
+    cross_check(manifest, problems)
+
+    if problems:
+        raise ManifestError(problems)
+
+    return manifest
+
+
+def write_manifest(manifest: Manifest, path: str = CACHE_PATH):
+    """Write a manifest to a compact JSON file.
+
+    Args:
+        manifest: The manifest to write.
+        path: The path of the file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as manifest_file:
+        json.dump(asdict(manifest), manifest_file, separators=(",", ":"))
+
+
+def read_manifest(path: str = CACHE_PATH):
+    """Read a manifest from a compact JSON file without re-validating it.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The manifest.
+    """
+    with open(path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    return Manifest(
+        key=manifest["key"],
+        folders=tuple(Folder(**folder) for folder in manifest["folders"]),
+        submodules=tuple(
+            (name, Submodule(**submodule)) for name, submodule in manifest["submodules"]
+        ),
+        connections=tuple(
+            Connection(**connection) for connection in manifest["connections"]
+        ),
+    )
+
+
+def load_manifest(workspace_dir: str = "/workspace", cache_path: str = CACHE_PATH):
+    """Load the workspace's manifest, compiling it if the cache is stale.
+
+    Args:
+        workspace_dir: The directory of the workspace.
+        cache_path: The path of the cached manifest.
+
+    Returns:
+        The manifest.
+
+    Raises:
+        ManifestError: If the manifest was compiled and problems were found.
+    """
+    try:
+        key = get_key(workspace_dir)
+        manifest = read_manifest(cache_path)
+        if manifest.key == key:
+            return manifest
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # The cache is missing or invalid so it's recompiled.
+
+    manifest = compile_manifest(workspace_dir)
+
+    try:
+        write_manifest(manifest, cache_path)
+    except OSError:
+        pass  # The manifest is still usable without being cached.
+
+    return manifest
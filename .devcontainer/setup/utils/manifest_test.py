@@ -0,0 +1,229 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 20:22:55(+01:00).
+"""
+
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from .manifest import (
+    Folder,
+    ManifestError,
+    compile_manifest,
+    get_key,
+    load_manifest,
+    read_manifest,
+)
+
+CONNECTION = {
+    "previewLimit": 50,
+    "server": "localhost",
+    "port": 5432,
+    "driver": "PostgreSQL",
+    "name": "portal",
+    "database": "portal",
+    "username": "root",
+    "password": "password",
+}
+
+
+def write_workspace(
+    workspace: Path,
+    folders: t.List[str],
+    submodules: t.List[str],
+    connections: t.Optional[t.List[t.Dict[str, t.Any]]] = None,
+):
+    """Write a workspace's code workspace and .gitmodules files.
+
+    Args:
+        workspace: The directory of the workspace.
+        folders: The paths of the code workspace's folders.
+        submodules: The paths of the submodules, which are also their names.
+        connections: The code workspace's SQL connections.
+    """
+    # Comments and trailing commas are valid in code workspaces.
+    (workspace / "codeforlife.code-workspace").write_text(
+        "{\n"
+        "  // The folders.\n"
+        f"  folders: {json.dumps([{'path': path} for path in folders])},\n"
+        f"  settings: {json.dumps({'sqltools.connections': connections or []})},\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    (workspace / ".gitmodules").write_text(
+        "".join(
+            f'[submodule "{path}"]\n'
+            f"\tpath = {path}\n"
+            f"\turl = https://github.com/ocadotechnology/{path}.git\n"
+            for path in submodules
+        ),
+        encoding="utf-8",
+    )
+
+
+def compile_problems(workspace: Path):
+    """Compile a workspace's manifest, expecting it to fail.
+
+    Args:
+        workspace: The directory of the workspace.
+
+    Returns:
+        The problems found.
+    """
+    with pytest.raises(ManifestError) as error:
+        compile_manifest(str(workspace))
+
+    return error.value.problems
+
+
+def test_compile_manifest(tmp_path: Path):
+    """The folders, submodules and SQL connections are merged."""
+    write_workspace(
+        tmp_path,
+        folders=[".", "backend", "backend/portal"],
+        submodules=["backend/portal"],
+        connections=[CONNECTION],
+    )
+
+    manifest = compile_manifest(str(tmp_path))
+
+    assert manifest.key == get_key(str(tmp_path))
+    assert manifest.folders == (
+        Folder(path="."),
+        Folder(path="backend"),
+        Folder(path="backend/portal"),
+    )
+    assert list(manifest.submodule_dict) == ["backend/portal"]
+    assert [c.name for c in manifest.postgresql_connections] == ["portal"]
+
+
+def test_compile_manifest__duplicate_folder_path(tmp_path: Path):
+    """Folders with the same path are a problem."""
+    write_workspace(
+        tmp_path,
+        folders=["backend/portal", "backend/portal"],
+        submodules=["backend/portal"],
+    )
+
+    assert compile_problems(tmp_path) == ["Duplicate folder path: backend/portal"]
+
+
+def test_compile_manifest__folder_without_submodule(tmp_path: Path):
+    """A folder which isn't a submodule or one of their parents is a problem."""
+    write_workspace(tmp_path, folders=["backend/portal"], submodules=[])
+
+    assert compile_problems(tmp_path) == ["Folder without a submodule: backend/portal"]
+
+
+def test_compile_manifest__submodule_without_folder(tmp_path: Path):
+    """A submodule which isn't a folder is a problem."""
+    write_workspace(tmp_path, folders=["."], submodules=["backend/portal"])
+
+    assert compile_problems(tmp_path) == ["Submodule without a folder: backend/portal"]
+
+
+def test_compile_manifest__connection_without_backend(tmp_path: Path):
+    """A connection whose backend service isn't a submodule is a problem."""
+    write_workspace(
+        tmp_path,
+        folders=["."],
+        submodules=[],
+        connections=[{**CONNECTION, "name": "legacy_portal"}],
+    )
+
+    assert compile_problems(tmp_path) == [
+        "Connection without a backend: legacy_portal"
+        " (expected submodule at legacy/portal)"
+    ]
+
+
+def test_compile_manifest__invalid_connection(tmp_path: Path):
+    """Every invalid connection is reported along with other problems."""
+    write_workspace(
+        tmp_path,
+        folders=[".", "backend/portal"],
+        submodules=[],
+        connections=[{"name": "portal"}],
+    )
+
+    problems = compile_problems(tmp_path)
+
+    assert len(problems) == 2
+    assert problems[0].startswith("sqltools.connections[0]: ")
+    assert problems[1] == "Folder without a submodule: backend/portal"
+
+
+def test_compile_manifest__wrongly_typed_connection(tmp_path: Path):
+    """A connection's values must be of its fields' types."""
+    write_workspace(
+        tmp_path,
+        folders=["."],
+        submodules=[],
+        connections=[
+            {**CONNECTION, "port": "5432"},
+            {**CONNECTION, "name": "sso", "previewLimit": None},
+            {**CONNECTION, "name": "contributor", "port": True},
+        ],
+    )
+
+    assert compile_problems(tmp_path) == [
+        "sqltools.connections[0]: 'port' must be of type int, not str.",
+        "sqltools.connections[1]: 'previewLimit' must be of type int, not NoneType.",
+        "sqltools.connections[2]: 'port' must be of type int, not bool.",
+    ]
+
+
+def test_compile_manifest__wrongly_typed_folder(tmp_path: Path):
+    """A folder's name is optional but must be a string if given."""
+    (tmp_path / "codeforlife.code-workspace").write_text(
+        json.dumps({"folders": [{"path": "."}, {"path": "backend", "name": 1}]}),
+        encoding="utf-8",
+    )
+    (tmp_path / ".gitmodules").write_text("", encoding="utf-8")
+
+    assert compile_problems(tmp_path) == [
+        "folders[1]: 'name' must be of type str or NoneType, not int."
+    ]
+
+
+def test_load_manifest__stale_cache(tmp_path: Path):
+    """The cached manifest is reused until a source file changes."""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    cache_path = str(tmp_path / ".cache" / "manifest.json")
+    write_workspace(workspace, folders=["."], submodules=[])
+
+    manifest = load_manifest(str(workspace), cache_path)
+
+    assert read_manifest(cache_path) == manifest
+    assert load_manifest(str(workspace), cache_path) == manifest
+
+    write_workspace(
+        workspace, folders=[".", "backend/portal"], submodules=["backend/portal"]
+    )
+
+    recompiled_manifest = load_manifest(str(workspace), cache_path)
+
+    assert recompiled_manifest.key != manifest.key
+    assert recompiled_manifest.folders == (
+        Folder(path="."),
+        Folder(path="backend/portal"),
+    )
+    assert read_manifest(cache_path) == recompiled_manifest
+
+
+def test_load_manifest__stale_cache_with_problems(tmp_path: Path):
+    """A stale cache isn't used when the changed source files have problems."""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    cache_path = str(tmp_path / ".cache" / "manifest.json")
+    write_workspace(workspace, folders=["."], submodules=[])
+    load_manifest(str(workspace), cache_path)
+
+    write_workspace(workspace, folders=[".", "backend/portal"], submodules=[])
+
+    with pytest.raises(ManifestError):
+        load_manifest(str(workspace), cache_path)
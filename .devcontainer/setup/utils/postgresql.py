@@ -4,11 +4,12 @@ Created on 14/04/2025 at 16:14:59(+01:00).
 """
 
 import subprocess
+import typing as t
 from dataclasses import dataclass
 from subprocess import CalledProcessError
+from time import sleep, time
 
 from . import pprint
-from .vscode import CodeWorkspace
 
 PSQL_BASE_COMMAND = ["psql", "-v", "ON_ERROR_STOP=1"]
 CONNECTION_OPTIONS = ["--username=root", "--host=db", "--port=5432"]
@@ -18,6 +19,12 @@ ENV = {"PGPASSWORD": "password"}
 # -c: Executes the given command.
 EXE_PSQL_CMD = "-tAc"
 
+# The version of the dev profile. Bump this whenever the profile changes so
+# that previously provisioned servers can be detected as outdated.
+DEV_PROFILE_VERSION = 1
+# A custom setting, persisted alongside the profile, recording its version.
+DEV_PROFILE_VERSION_SETTING = "cfl.dev_profile_version"
+
 
 @dataclass(frozen=True)
 # pylint: disable-next=too-many-instance-attributes
@@ -176,30 +183,17 @@ def create_database(username: str, dbname: str):
         return False
 
 
-def create_resources(code_workspace: CodeWorkspace):
+def create_resources(connections: t.Sequence[Connection]):
     """Create PostgreSQL resources.
 
     Args:
-        code_workspace: The code workspace to read the SQL connections from.
+        connections: The PostgreSQL connections to create the resources of.
 
     Returns:
         A flag designating whether any error occurred during the process.
     """
     error = False
 
-    connections = code_workspace["settings"].get("sqltools.connections")
-
-    try:
-        assert isinstance(connections, list)
-        assert all(isinstance(connection, dict) for connection in connections)
-        connections = [Connection(**connection) for connection in connections]
-    except (AssertionError, TypeError):
-        return False
-
-    connections = [
-        connection for connection in connections if connection.driver == "PostgreSQL"
-    ]
-
     for i, connection in enumerate(connections, start=1):
         pprint.header(f"Database ({i}/{len(connections)}): {connection.name}")
 
@@ -222,3 +216,366 @@ def create_resources(code_workspace: CodeWorkspace):
         print()
 
     return error
+
+
+def run_psql(
+    *commands: str,
+    dbname: t.Optional[str] = None,
+    timeout: t.Optional[float] = None,
+):
+    """Run one or more commands with psql and return the output.
+
+    Each command is sent separately so that commands which can't run inside a
+    transaction block (e.g. ALTER SYSTEM) can be chained.
+
+    Args:
+        commands: The SQL commands to execute.
+        dbname: The database to connect to. Defaults to the user's database.
+        timeout: The max number of seconds to wait for psql to finish.
+
+    Returns:
+        The stripped output of the commands.
+    """
+    args = [*PSQL_BASE_COMMAND, *CONNECTION_OPTIONS, "-tA"]
+    if dbname:
+        args.append(f"--dbname={dbname}")
+    for command in commands:
+        args += ["-c", command]
+
+    return (
+        subprocess.run(
+            args,
+            check=True,
+            stdout=subprocess.PIPE,
+            env=ENV,
+            timeout=timeout,
+        )
+        .stdout.decode("utf-8")
+        .strip()
+    )
+
+
+def get_server_memory() -> int:
+    """Get the memory available to the PostgreSQL server's container.
+
+    The files are read by the server itself (as the superuser) so that the
+    memory of the db service's container is detected, not this container's.
+
+    Returns:
+        The memory in bytes.
+    """
+
+    def read_server_file(path: str):
+        return run_psql(f"SELECT pg_read_file('{path}', 0, 65536, true);")
+
+    memory: t.Optional[int] = None
+
+    meminfo = read_server_file("/proc/meminfo")
+    for line in meminfo.splitlines():
+        if line.startswith("MemTotal:"):
+            memory = int(line.split()[1]) * 1024  # kB to bytes.
+            break
+
+    # cgroup v2, then cgroup v1. An unlimited cgroup reports "max" (v2) or an
+    # arbitrarily large number (v1), so the smaller of the limits is taken.
+    for path in [
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ]:
+        limit = read_server_file(path)
+        if limit.isdigit():
+            memory = int(limit) if memory is None else min(memory, int(limit))
+            break
+
+    assert memory is not None, "Failed to detect the server's memory."
+
+    return memory
+
+
+def get_dev_profile(memory: int):
+    """Get the dev/test performance profile for the PostgreSQL server.
+
+    The profile trades durability for speed. This is acceptable as the data in
+    a dev container is disposable and can be re-created by migrating.
+
+    Args:
+        memory: The memory available to the server in bytes.
+
+    Returns:
+        A dict where the key is the name of a setting and the value is its
+        value in the profile.
+    """
+    mb = 1024 * 1024
+
+    return {
+        # Don't wait for data to be flushed to disk.
+        "fsync": "off",
+        "synchronous_commit": "off",
+        "full_page_writes": "off",
+        # Skip WAL for bulk operations (e.g. CREATE TABLE, COPY) in migrations.
+        "wal_level": "minimal",
+        "max_wal_senders": "0",
+        # Avoid frequent checkpoints during migrations.
+        "checkpoint_timeout": "30min",
+        "max_wal_size": "4GB",
+        # Size memory relative to the container's memory.
+        "shared_buffers": f"{min(memory // 4, 2048 * mb) // mb}MB",
+        "effective_cache_size": f"{memory // 2 // mb}MB",
+        "maintenance_work_mem": f"{min(memory // 16, 1024 * mb) // mb}MB",
+        "work_mem": "16MB",
+        # The data is stored on local storage.
+        "random_page_cost": "1.1",
+        # Compiling short-lived test queries costs more than it saves.
+        "jit": "off",
+    }
+
+
+def get_dev_profile_version():
+    """Get the version of the dev profile applied to the server.
+
+    Returns:
+        The version or None if no profile is applied.
+    """
+    version = run_psql(
+        f"SELECT current_setting('{DEV_PROFILE_VERSION_SETTING}', true);"
+    )
+
+    return int(version) if version.isdigit() else None
+
+
+def get_pending_restart_settings():
+    """Get the settings which require a server restart to take effect.
+
+    Returns:
+        The names of the settings.
+    """
+    return run_psql("SELECT name FROM pg_settings WHERE pending_restart;").splitlines()
+
+
+def reload_server():
+    """Reload the server's configuration files.
+
+    Returns:
+        A flag designating whether a restart is required.
+    """
+    run_psql("SELECT pg_reload_conf();")
+
+    # The reload is signaled asynchronously so give the server a moment.
+    sleep(1)
+
+    return bool(get_pending_restart_settings())
+
+
+def restart_server(timeout: int = 60):
+    """Restart the PostgreSQL server.
+
+    The server is stopped and the db service's restart policy (unless-stopped)
+    brings its container back up.
+
+    Args:
+        timeout: The max number of seconds to wait for the server to restart.
+
+    Returns:
+        A flag designating whether the server was restarted.
+    """
+    pprint.notice("Restarting server...")
+
+    start_time_query = "SELECT pg_postmaster_start_time();"
+    start_time = run_psql(start_time_query)
+    data_directory = run_psql("SHOW data_directory;")
+
+    try:
+        run_psql(
+            "COPY (SELECT 1) TO PROGRAM 'pg_ctl stop"
+            f" --mode=fast --no-wait --pgdata={data_directory}';"
+        )
+    except CalledProcessError:
+        pass  # The connection may be terminated by the shutdown.
+
+    deadline = time() + timeout
+    while time() < deadline:
+        sleep(1)
+        try:
+            if run_psql(start_time_query) != start_time:
+                return True
+        except CalledProcessError:
+            pass  # The server is still restarting.
+
+    pprint.error("Failed to restart server.")
+    return False
+
+
+def apply_settings(settings: t.Dict[str, t.Optional[str]]):
+    """Persist settings with ALTER SYSTEM and reload or restart the server.
+
+    Args:
+        settings: The settings to apply. A value of None resets the setting.
+
+    Returns:
+        A flag designating whether the settings were applied.
+    """
+    try:
+        run_psql(
+            *(
+                (
+                    f"ALTER SYSTEM RESET {name};"
+                    if value is None
+                    else f"ALTER SYSTEM SET {name} = '{value}';"
+                )
+                for name, value in settings.items()
+            )
+        )
+
+        if reload_server():
+            return restart_server()
+
+        return True
+    except CalledProcessError:
+        pprint.error("Failed to apply settings.")
+        return False
+
+
+def apply_dev_profile():
+    """Apply the dev/test performance profile to the PostgreSQL server.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    try:
+        version = get_dev_profile_version()
+        memory = get_server_memory()
+    except (CalledProcessError, AssertionError):
+        pprint.error("Failed to inspect server.")
+        return True
+
+    if version is not None:
+        print(f"Profile version {version} is applied.")
+
+    print(f"Server has {memory // (1024 * 1024)}MB of memory.")
+
+    pprint.notice(f"Applying profile version {DEV_PROFILE_VERSION}...")
+
+    applied = apply_settings(
+        {
+            **get_dev_profile(memory),
+            DEV_PROFILE_VERSION_SETTING: str(DEV_PROFILE_VERSION),
+        }
+    )
+
+    return not applied
+
+
+def report_dev_profile():
+    """Print how the PostgreSQL server's settings compare to the dev profile.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    try:
+        version = get_dev_profile_version()
+        profile = get_dev_profile(get_server_memory())
+        names = ", ".join(f"'{name}'" for name in profile)
+        rows = run_psql(
+            "SELECT name, current_setting(name), pending_restart"
+            f" FROM pg_settings WHERE name IN ({names}) ORDER BY name;"
+        ).splitlines()
+    except (CalledProcessError, AssertionError):
+        pprint.error("Failed to inspect server.")
+        return True
+
+    if version is None:
+        pprint.warn("Profile is not applied.")
+    elif version != DEV_PROFILE_VERSION:
+        pprint.warn(
+            f"Profile version {version} is applied but the latest version is"
+            f" {DEV_PROFILE_VERSION}."
+        )
+    else:
+        pprint.success(f"Profile version {version} is applied.")
+
+    print(f"\n{'Setting':<24}{'Current':<16}{'Profile':<16}Pending Restart")
+    for row in rows:
+        name, current, pending_restart = row.split("|")
+        print(
+            f"{name:<24}{current:<16}{profile[name]:<16}"
+            + ("yes" if pending_restart == "t" else "no")
+        )
+
+    return False
+
+
+def revert_dev_profile():
+    """Revert the PostgreSQL server's settings to their defaults.
+
+    Returns:
+        A flag designating whether any error occurred during the process.
+    """
+    pprint.notice("Reverting profile...")
+
+    # The memory doesn't affect the names of the settings.
+    names = [*get_dev_profile(memory=0), DEV_PROFILE_VERSION_SETTING]
+
+    return not apply_settings({name: None for name in names})
+
+
+def get_service_path(connection: Connection):
+    """Get the path of the backend service which owns a connection.
+
+    By convention, a connection named "legacy_<name>" belongs to the service in
+    legacy/<name> and all others to the service in backend/<name>, where
+    underscores in the name are hyphens in the directory's name.
+
+    Args:
+        connection: The connection of the service.
+
+    Returns:
+        The path of the service's directory, relative to the workspace.
+    """
+    name = connection.name
+    parent_dir = "backend"
+    if name.startswith("legacy_"):
+        name = name.removeprefix("legacy_")
+        parent_dir = "legacy"
+
+    return f"{parent_dir}/{name.replace('_', '-')}"
+
+
+def get_service_dir(connection: Connection):
+    """Get the directory of the backend service which owns a connection.
+
+    Args:
+        connection: The connection of the service.
+
+    Returns:
+        The path of the service's directory.
+    """
+    return f"/workspace/{get_service_path(connection)}"
+
+
+def drop_database(dbname: str):
+    """Drop a PostgreSQL database, terminating any open sessions.
+
+    Args:
+        dbname: The name of the database.
+    """
+    if run_psql(f"SELECT 1 FROM pg_database WHERE datname='{dbname}';") == "1":
+        # Template databases can't be dropped.
+        run_psql(
+            f"ALTER DATABASE {dbname} IS_TEMPLATE false;",
+            f"DROP DATABASE {dbname} WITH (FORCE);",
+        )
+
+
+def get_database_comment(dbname: str):
+    """Get the comment of a PostgreSQL database.
+
+    Args:
+        dbname: The name of the database.
+
+    Returns:
+        The comment or an empty string if the database or comment doesn't exist.
+    """
+    return run_psql(
+        "SELECT shobj_description(oid, 'pg_database') FROM pg_database"
+        f" WHERE datname='{dbname}';"
+    )
@@ -0,0 +1,305 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 14:21:09(+01:00).
+
+Read-only checks of the workspace's state.
+"""
+
+import json
+import os
+import subprocess
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from subprocess import CalledProcessError, TimeoutExpired
+
+from colorama import Fore, Style
+from redis import RedisError
+
+from . import cache, postgresql
+from .git import Submodule, SubmoduleDict
+from .postgresql import Connection
+
+TIMEOUT = 5
+
+
+@dataclass(frozen=True)
+class Check:
+    """The result of checking part of the workspace."""
+
+    section: str
+    name: str
+    ok: bool
+    detail: str
+
+
+def run_git(path: str, *args: str):
+    """Run a git command in a repo and return the output.
+
+    Optional locks are disabled so that checks don't refresh the index and
+    contend for its lock with other git clients, such as VS Code's.
+
+    Args:
+        path: The path of the repo.
+        args: The arguments of the git command.
+
+    Returns:
+        The output of the command.
+    """
+    return subprocess.run(
+        ["git", "--no-optional-locks", "-C", path, *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        timeout=TIMEOUT,
+    ).stdout.decode("utf-8")
+
+
+def compare_to_upstream(path: str):
+    """Count the commits a repo is ahead and behind its remote's default branch.
+
+    Local refs are compared so nothing is fetched. The upstream remote is
+    preferred. The origin remote, which is the fork, is only compared against
+    if the upstream's default branch isn't known locally.
+
+    Args:
+        path: The path of the repo.
+
+    Returns:
+        The number of commits ahead and behind the remote's default branch, or
+        why they couldn't be counted.
+    """
+    try:
+        remote_heads = run_git(
+            path,
+            "for-each-ref",
+            "--format=%(refname:lstrip=2) %(symref:lstrip=3)",
+            "refs/remotes/upstream/HEAD",
+            "refs/remotes/origin/HEAD",
+        )
+        default_branches = dict(
+            line.split(" ", 1) for line in remote_heads.splitlines()
+        )
+        remote = next(
+            (
+                remote
+                for remote in ["upstream", "origin"]
+                if default_branches.get(f"{remote}/HEAD")
+            ),
+            None,
+        )
+        if remote is None:
+            return "remotes not fetched"
+
+        default_branch = f"{remote}/{default_branches[f'{remote}/HEAD']}"
+        ahead, behind = run_git(
+            path,
+            "rev-list",
+            "--left-right",
+            "--count",
+            f"HEAD...refs/remotes/{default_branch}",
+        ).split()
+    except (CalledProcessError, TimeoutExpired):
+        return "remotes not fetched"
+
+    return f"+{ahead}/-{behind} {default_branch}"
+
+
+def check_submodule(name: str, submodule: Submodule):
+    """Check a submodule is cloned from a fork and report its branch's state.
+
+    Args:
+        name: The name of the submodule.
+        submodule: The submodule to check.
+
+    Returns:
+        The result of the check.
+    """
+    path = f"/workspace/{submodule.path}"
+
+    def check(ok: bool, detail: str):
+        return Check(section="submodule", name=name, ok=ok, detail=detail)
+
+    if not os.path.exists(os.path.join(path, ".git")):
+        return check(False, "not cloned")
+
+    try:
+        # Both the branch's and working tree's state in a single call.
+        # https://git-scm.com/docs/git-status#_porcelain_format_version_2
+        git_status = run_git(path, "status", "--porcelain=v2", "--branch")
+        remotes = run_git(path, "config", "--get-regexp", r"^remote\..*\.url$")
+    except (CalledProcessError, TimeoutExpired):
+        return check(False, "failed to read repo")
+
+    branch, dirty = "(detached)", False
+    for line in git_status.splitlines():
+        if line.startswith("# branch.head "):
+            branch = line.split(" ", 2)[2]
+        elif not line.startswith("#"):
+            dirty = True
+
+    remote_urls = dict(line.split(" ", 1) for line in remotes.splitlines())
+    origin_url = remote_urls.get("remote.origin.url")
+    # Cloning a fork with the GitHub CLI adds the parent as the upstream remote.
+    forked = "remote.upstream.url" in remote_urls and origin_url != submodule.url
+
+    details = [branch, compare_to_upstream(path)]
+    if dirty:
+        details.append("dirty")
+    if not forked:
+        details.append("fork remote not set")
+
+    return check(forked, ", ".join(details))
+
+
+def check_databases(connections: t.Sequence[Connection]):
+    """Check each declared PostgreSQL database and role exists.
+
+    The catalogs are queried once for all connections.
+
+    Args:
+        connections: The PostgreSQL connections to check.
+
+    Returns:
+        The results of the checks.
+    """
+    try:
+        databases, roles = (
+            set(names.split(","))
+            for names in postgresql.run_psql(
+                "SELECT string_agg(datname, ',') FROM pg_database;",
+                "SELECT string_agg(rolname, ',') FROM pg_roles;",
+                timeout=TIMEOUT,
+            ).splitlines()
+        )
+    except (CalledProcessError, TimeoutExpired, FileNotFoundError, ValueError):
+        return [Check("database", "server", False, "unreachable")]
+
+    checks: t.List[Check] = []
+    for connection in connections:
+        missing = [
+            f"{kind} {name} missing"
+            for kind, name, names in [
+                ("database", connection.database, databases),
+                ("role", connection.username, roles),
+            ]
+            if name not in names
+        ]
+
+        checks.append(
+            Check(
+                section="database",
+                name=connection.name,
+                ok=not missing,
+                detail=", ".join(missing) or "ok",
+            )
+        )
+
+    return checks
+
+
+def check_cache():
+    """Check the Redis server is reachable.
+
+    Returns:
+        The result of the check.
+    """
+    try:
+        cache.get_client().ping()
+    except RedisError:
+        return Check("cache", "server", False, "unreachable")
+
+    return Check("cache", "server", True, "ok")
+
+
+def check_github():
+    """Check the GitHub CLI is logged in.
+
+    Returns:
+        The result of the check.
+    """
+    try:
+        subprocess.run(
+            ["gh", "auth", "status"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=TIMEOUT,
+        )
+    except (CalledProcessError, TimeoutExpired, FileNotFoundError):
+        return Check("github", "auth", False, "not logged in")
+
+    return Check("github", "auth", True, "logged in")
+
+
+def get_checks(
+    submodules: SubmoduleDict,
+    connections: t.Sequence[Connection],
+):
+    """Check every part of the workspace concurrently.
+
+    Args:
+        submodules: The submodules to check.
+        connections: The PostgreSQL connections to check.
+
+    Returns:
+        The results of the checks.
+    """
+    with ThreadPoolExecutor(max_workers=len(submodules) + 3) as executor:
+        submodule_futures = [
+            executor.submit(check_submodule, name, submodule)
+            for name, submodule in submodules.items()
+        ]
+        databases_future = executor.submit(check_databases, connections)
+        cache_future = executor.submit(check_cache)
+        github_future = executor.submit(check_github)
+
+        return [
+            *(future.result() for future in submodule_futures),
+            *databases_future.result(),
+            cache_future.result(),
+            github_future.result(),
+        ]
+
+
+def print_checks(checks: t.List[Check]):
+    """Print the results of the checks as a table.
+
+    Args:
+        checks: The results of the checks.
+    """
+    section_width = max(len(check.section) for check in checks) + 2
+    name_width = max(len(check.name) for check in checks) + 2
+
+    for check in checks:
+        print(
+            f"{check.section:<{section_width}}{check.name:<{name_width}}"
+            + (Fore.GREEN + "✔ " if check.ok else Fore.RED + "✘ ")
+            + Style.RESET_ALL
+            + check.detail
+        )
+
+
+def status(
+    submodules: SubmoduleDict,
+    connections: t.Sequence[Connection],
+    as_json: bool = False,
+):
+    """Print the state of the workspace.
+
+    Args:
+        submodules: The submodules to check.
+        connections: The PostgreSQL connections to check.
+        as_json: Whether to print the results as JSON instead of a table.
+
+    Returns:
+        A flag designating whether any check failed.
+    """
+    checks = get_checks(submodules, connections)
+
+    if as_json:
+        print(json.dumps([asdict(check) for check in checks], indent=2))
+    else:
+        print_checks(checks)
+
+    return not all(check.ok for check in checks)
@@ -24,15 +24,16 @@ class CodeWorkspace(t.TypedDict):
     settings: t.Dict[str, t.Any]
 
 
-def load_code_workspace() -> CodeWorkspace:
+def load_code_workspace(
+    path: str = "/workspace/codeforlife.code-workspace",
+) -> CodeWorkspace:
     """Load the .code-workspace file.
 
+    Args:
+        path: The path of the .code-workspace file.
+
     Returns:
         A JSON dict containing the code workspace.
     """
-    with open(
-        "/workspace/codeforlife.code-workspace",
-        "r",
-        encoding="utf-8",
-    ) as code_workspace:
+    with open(path, "r", encoding="utf-8") as code_workspace:
         return pyjson5.load(code_workspace)